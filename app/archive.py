@@ -0,0 +1,87 @@
+"""
+Particionamento quente/frio dos cards.
+
+Cards pagos e vencidos há mais de FINANCE_ARCHIVE_AFTER_DAYS dias saem da tabela `card`
+para `card_archive` em lotes, por uma tarefa periódica. As rotas do dia a dia leem só
+a tabela ativa; histórico e exportação juntam as duas.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.database import iter_data_engines
+from app.models import Card, CardArchive, CardStatus
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("FINANCE_ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("FINANCE_ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("FINANCE_ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+logger = logging.getLogger(__name__)
+
+
+def archive_cold_cards(
+    engine: Engine,
+    cutoff: Optional[date] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Move cards pagos com vencimento anterior a cutoff para card_archive. Retorna quantos moveu."""
+    if cutoff is None:
+        cutoff = date.today() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    cold = (Card.status == CardStatus.PAGO, Card.due_date < cutoff)
+    columns = [name for name in CardArchive.model_fields if name not in ("id", "archived_at")]
+    moved = 0
+    with Session(engine) as session:
+        while True:
+            ids = session.exec(select(Card.id).where(*cold).limit(batch_size)).all()
+            if not ids:
+                break
+            # O INSERT abre a transação de escrita: outro worker arquivando o mesmo lote espera
+            # o commit e depois não encontra mais os cards (copia 0 e apaga 0)
+            copy = select(*[getattr(Card, name) for name in columns], literal(datetime.utcnow()))
+            session.exec(
+                insert(CardArchive).from_select(
+                    [*columns, "archived_at"], copy.where(Card.id.in_(ids), *cold)
+                )
+            )
+            deleted = session.exec(delete(Card).where(Card.id.in_(ids), *cold)).rowcount
+            if deleted != len(ids):
+                # Parte do lote mudou ou já foi arquivada por outro worker: desfaz e relê
+                session.rollback()
+                continue
+            session.commit()
+            moved += deleted
+            if len(ids) < batch_size:
+                break
+    return moved
+
+
+def archive_all() -> int:
+    """Executa o arquivamento em todos os bancos de dados (principal ou shards)."""
+    return sum(archive_cold_cards(engine) for engine in iter_data_engines())
+
+
+async def run_archiver(interval: int = ARCHIVE_INTERVAL_SECONDS) -> None:
+    """Laço da tarefa de fundo: arquiva a cada `interval` segundos, fora do event loop."""
+    while True:
+        try:
+            moved = await asyncio.to_thread(archive_all)
+            if moved:
+                logger.info("%d cards arquivados", moved)
+        except Exception:
+            logger.exception("Falha ao arquivar cards")
+        await asyncio.sleep(interval)
+
+
+def get_card_history(session: Session, user_id: int) -> list[Card | CardArchive]:
+    """Cards ativos e arquivados do usuário, ordenados por urgência e vencimento."""
+    active = session.exec(select(Card).where(Card.user_id == user_id)).all()
+    archived = session.exec(select(CardArchive).where(CardArchive.user_id == user_id)).all()
+    return sorted([*active, *archived], key=lambda c: (c.urgency, c.due_date))
@@ -0,0 +1,115 @@
+"""
+Build e entrega dos arquivos estáticos do frontend.
+
+`python -m app.assets` gera static/dist com nomes versionados por hash
+(ex.: js/app.3f9c0a1b2d.js), o index.html reescrito e variantes pré-comprimidas
+(.gz, .br, .zst conforme disponível). O servidor prefere static/dist se existir.
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.compression import COMPRESSORS, FILE_EXTENSIONS, select_encoding, weaken_etag, would_compress
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+DIST_DIR = STATIC_DIR / "dist"
+
+# Arquivos referenciados pelo index.html que recebem hash no nome
+HASHED_ASSETS = ("css/style.css", "js/app.js")
+HASH_PATTERN = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+def _hashed_name(relative: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    stem, ext = os.path.splitext(relative)
+    return f"{stem}.{digest}{ext}"
+
+
+def _write_precompressed(path: Path, content: bytes) -> None:
+    for encoding, compress in COMPRESSORS.items():
+        compressed = compress(content, True)
+        if len(compressed) < len(content):
+            path.with_name(path.name + FILE_EXTENSIONS[encoding]).write_bytes(compressed)
+
+
+def build_assets(source: Path = STATIC_DIR, target: Path = DIST_DIR) -> dict[str, str]:
+    """Gera o diretório dist e retorna o mapa nome original -> nome com hash."""
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+
+    manifest: dict[str, str] = {}
+    for relative in HASHED_ASSETS:
+        content = (source / relative).read_bytes()
+        hashed = _hashed_name(relative, content)
+        out = target / hashed
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_bytes(content)
+        _write_precompressed(out, content)
+        manifest[relative] = hashed
+
+    index = (source / "index.html").read_text(encoding="utf-8")
+    for original, hashed in manifest.items():
+        index = index.replace(f'"{original}"', f'"{hashed}"')
+    index_bytes = index.encode("utf-8")
+    (target / "index.html").write_bytes(index_bytes)
+    _write_precompressed(target / "index.html", index_bytes)
+    return manifest
+
+
+class AssetStaticFiles(StaticFiles):
+    """
+    StaticFiles que serve variantes pré-comprimidas quando o cliente aceita
+    e define Cache-Control: imutável para nomes com hash, revalidação (ETag) no resto.
+    """
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        cache_control = IMMUTABLE_CACHE if HASH_PATTERN.search(full_path) else REVALIDATE_CACHE
+        headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+        available = [enc for enc in COMPRESSORS if os.path.isfile(full_path + FILE_EXTENSIONS[enc])]
+        encoding = select_encoding(request_headers.get("accept-encoding", ""), available)
+        if encoding is not None:
+            full_path = full_path + FILE_EXTENSIONS[encoding]
+            stat_result = os.stat(full_path)
+            headers["Content-Encoding"] = encoding
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            media_type=media_type,
+            headers=headers,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            not_modified = NotModifiedResponse(response.headers)
+            if (
+                encoding is None
+                and select_encoding(request_headers.get("accept-encoding", "")) is not None
+                and would_compress(media_type, stat_result.st_size)
+            ):
+                # O 200 equivalente seria comprimido pelo middleware, que enfraquece o ETag
+                weaken_etag(not_modified.headers)
+            return not_modified
+        return response
+
+
+if __name__ == "__main__":
+    for original, hashed in build_assets().items():
+        print(f"{original} -> {hashed}")
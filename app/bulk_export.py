@@ -0,0 +1,144 @@
+"""
+Exportação em lote das planilhas de todos os usuários para um único ZIP.
+
+    python -m app.bulk_export financas.zip
+    python -m app.bulk_export financas.zip --workers 8 --chunk-size 25 --max-memory-mb 256
+
+Os usuários são divididos em lotes entre processos; cada planilha usa o mesmo layout de
+/api/export/spreadsheet e entra no ZIP assim que fica pronta. Nunca há mais lotes em andamento
+que processos. --max-memory-mb limita apenas as planilhas prontas aguardando escrita no ZIP
+(estimadas pelo tamanho médio do .xlsx); a memória de cada processo (workbook do openpyxl)
+é controlada por --workers e --chunk-size. Falhas de um usuário são reportadas e não
+interrompem a exportação.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import re
+import sys
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from sqlmodel import Session, select
+
+from app.database import create_db_and_tables, dispose_engines, engine, get_engine_for_user
+from app.models import User
+from app.routers.export import _build_workbook
+
+DEFAULT_CHUNK_SIZE = 25
+DEFAULT_MAX_MEMORY_MB = 256
+
+
+def _init_worker() -> None:
+    # Conexões herdadas do processo pai (fork) não podem ser reutilizadas
+    dispose_engines(close=False)
+
+
+def _archive_name(user: User) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", user.username)
+    return f"{user.id}_{safe}.xlsx"
+
+
+def render_users(user_ids: list[int]) -> tuple[list[tuple[str, bytes]], list[tuple[int, str]]]:
+    """
+    Gera as planilhas dos usuários informados.
+    Retorna ([(nome no zip, conteúdo)], [(user_id, erro)]).
+    """
+    results = []
+    errors = []
+    with Session(engine) as users_session:
+        users = users_session.exec(select(User).where(User.id.in_(user_ids))).all()
+        for user in users:
+            try:
+                with Session(get_engine_for_user(user.id)) as session:
+                    wb = _build_workbook(session, user)
+                buffer = io.BytesIO()
+                wb.save(buffer)
+            except Exception as exc:
+                errors.append((user.id, f"{type(exc).__name__}: {exc}"))
+                continue
+            results.append((_archive_name(user), buffer.getvalue()))
+    return results, errors
+
+
+def _report(done: int, total: int) -> None:
+    end = "\n" if done == total else ""
+    print(f"\r{done}/{total} usuários exportados", end=end, file=sys.stderr, flush=True)
+
+
+def _report_error(user_id: int, error: str) -> None:
+    print(f"\nusuário {user_id}: falha na exportação ({error})", file=sys.stderr, flush=True)
+
+
+def export_all(
+    output: str,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_memory_mb: int = DEFAULT_MAX_MEMORY_MB,
+) -> tuple[int, int]:
+    """Exporta todos os usuários para o ZIP `output`. Retorna (planilhas escritas, falhas)."""
+    create_db_and_tables()
+    with Session(engine) as session:
+        user_ids = list(session.exec(select(User.id).order_by(User.id)).all())
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    max_memory = max_memory_mb * 1024 * 1024
+
+    written = 0
+    failed = 0
+    total_bytes = 0
+    pending: dict[Future, list[int]] = {}
+    _report(0, len(user_ids))
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        next_chunk = 0
+        while next_chunk < len(chunks) or pending:
+            # No máximo um lote por processo; com planilhas grandes, menos (saída em buffer)
+            avg_chunk_bytes = (total_bytes / written * chunk_size) if written else 0
+            max_in_flight = workers
+            if avg_chunk_bytes:
+                max_in_flight = max(1, min(workers, int(max_memory // avg_chunk_bytes)))
+            while next_chunk < len(chunks) and len(pending) < max_in_flight:
+                chunk = chunks[next_chunk]
+                pending[pool.submit(render_users, chunk)] = chunk
+                next_chunk += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    results, errors = future.result()
+                except Exception as exc:
+                    # Lote inteiro perdido (ex.: processo morto): reporta todos os usuários dele
+                    results, errors = [], [(user_id, f"{type(exc).__name__}: {exc}") for user_id in chunk]
+                for name, content in results:
+                    archive.writestr(name, content)
+                    written += 1
+                    total_bytes += len(content)
+                for user_id, error in errors:
+                    _report_error(user_id, error)
+                failed += len(errors)
+                _report(written + failed, len(user_ids))
+    return written, failed
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.bulk_export", description=__doc__.splitlines()[1])
+    parser.add_argument("output", help="arquivo .zip de saída")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: número de CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="usuários por tarefa")
+    parser.add_argument(
+        "--max-memory-mb", type=int, default=DEFAULT_MAX_MEMORY_MB,
+        help="memória aproximada para planilhas prontas aguardando escrita no ZIP",
+    )
+    args = parser.parse_args(argv)
+    _, failed = export_all(args.output, args.workers, args.chunk_size, args.max_memory_mb)
+    if failed:
+        print(f"{failed} usuário(s) não exportado(s)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
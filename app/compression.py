@@ -0,0 +1,140 @@
+"""Compressão de respostas HTTP (gzip e, se instalados, brotli/zstd)."""
+from __future__ import annotations
+
+import gzip
+import os
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # brotli é opcional
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+try:  # zstandard é opcional
+    import zstandard
+except ImportError:  # pragma: no cover - depende do ambiente
+    zstandard = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("FINANCE_COMPRESSION_MIN_SIZE", "1024"))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+
+
+def _gzip(data: bytes, best: bool) -> bytes:
+    return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+
+
+def _brotli(data: bytes, best: bool) -> bytes:
+    return brotli.compress(data, quality=11 if best else 5)
+
+
+def _zstd(data: bytes, best: bool) -> bytes:
+    return zstandard.ZstdCompressor(level=19 if best else 3).compress(data)
+
+
+# Ordem de preferência quando o cliente aceita mais de uma codificação.
+# best=True é usado na pré-compressão em build; False nas respostas dinâmicas.
+COMPRESSORS: dict[str, Callable[[bytes, bool], bytes]] = {}
+if brotli is not None:
+    COMPRESSORS["br"] = _brotli
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _zstd
+COMPRESSORS["gzip"] = _gzip
+
+FILE_EXTENSIONS = {"br": ".br", "zstd": ".zst", "gzip": ".gz"}
+
+
+def select_encoding(accept_encoding: str, available=None) -> str | None:
+    """Escolhe a melhor codificação aceita pelo cliente (ignora as com q=0)."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    for encoding in available if available is not None else COMPRESSORS:
+        if encoding in accepted or ("*" in accepted and encoding != "identity"):
+            return encoding
+    return None
+
+
+def _is_compressible(content_type: str) -> bool:
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def would_compress(content_type: str, size: int, minimum_size: int = COMPRESSION_MIN_SIZE) -> bool:
+    """Indica se o middleware comprimiria um corpo desse tipo e tamanho (sem Content-Encoding)."""
+    return size >= minimum_size and _is_compressible(content_type)
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas com corpo único acima de minimum_size.
+    Respostas em streaming ou que já têm Content-Encoding passam intactas. Um 304 não tem corpo
+    e também passa intacto: quem o gera repete o ETag do 200 (ver AssetStaticFiles).
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        initial_message: Message = {}
+        started = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal initial_message, started
+            if message["type"] == "http.response.start":
+                initial_message = message
+                return
+            if message["type"] != "http.response.body" or started:
+                await send(message)
+                return
+
+            started = True
+            headers = MutableHeaders(raw=initial_message["headers"])
+            body = message.get("body", b"")
+            if (
+                not message.get("more_body", False)
+                and "content-encoding" not in headers
+                and would_compress(headers.get("content-type", ""), len(body), self.minimum_size)
+            ):
+                body = COMPRESSORS[encoding](body, False)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                # O mesmo ETag forte não pode valer para o corpo original e o comprimido
+                weaken_etag(headers)
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                message["body"] = body
+            await send(initial_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -1,10 +1,30 @@
 """Configuração do banco de dados SQLite."""
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Optional
+
 from sqlalchemy import text
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, SQLModel, create_engine
 
 DATABASE_URL = "sqlite:///./finance_manager.db"
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 
+# Sharding opcional dos dados (Balance/Card) por user_id:
+# "0" = desligado (tudo em finance_manager.db), N = N arquivos, "user" = um arquivo por usuário.
+# A tabela de usuários continua sempre no banco principal.
+SHARD_MODE = os.getenv("FINANCE_SHARDS", "0").strip().lower()
+SHARD_DIR = Path(os.getenv("FINANCE_SHARD_DIR", "./shards"))
+SHARDED_TABLES = ("balance", "card", "card_archive")
+# Engines de shard abertos ao mesmo tempo; os menos usados são descartados (dispose)
+SHARD_ENGINE_CACHE_SIZE = int(os.getenv("FINANCE_SHARD_ENGINE_CACHE_SIZE", "128"))
+
+_shard_engines: OrderedDict[str, Engine] = OrderedDict()
+_shard_lock = threading.Lock()
+
 
 def create_db_and_tables():
     """Cria as tabelas no banco de dados e aplica migrações leves."""
@@ -34,6 +54,122 @@ def _run_migrations():
         if not _column_exists(conn, "balance", "user_id"):
             _add_column(conn, "balance", "user_id INTEGER")
 
+    _migrate_session_revocation_autoincrement()
+    create_search_index(engine)
+
+
+def _migrate_session_revocation_autoincrement():
+    """Recria session_revocation com AUTOINCREMENT (bancos criados antes não o tinham)."""
+    table = SQLModel.metadata.tables["session_revocation"]
+    with engine.begin() as conn:
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'session_revocation'")
+        ).scalar()
+        if sql is None or "AUTOINCREMENT" in sql.upper():
+            return
+        conn.execute(text("ALTER TABLE session_revocation RENAME TO session_revocation_old"))
+        for index in table.indexes:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{index.name}"'))
+        table.create(conn)
+        conn.execute(text(
+            "INSERT INTO session_revocation (id, session_id, created_at) "
+            "SELECT id, session_id, created_at FROM session_revocation_old"
+        ))
+        conn.execute(text("DROP TABLE session_revocation_old"))
+
+
+def create_search_index(target: Engine) -> None:
+    """
+    Cria o índice FTS5 sobre card.title (sem acentos: "alimentacao" encontra "Alimentação")
+    e os triggers que o mantêm sincronizado. Indexa os cards existentes na criação.
+    """
+    with target.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'card_fts'")
+        ).first()
+        if exists:
+            return
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE card_fts USING fts5("
+            "title, content='card', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER card_fts_insert AFTER INSERT ON card BEGIN "
+            "INSERT INTO card_fts(rowid, title) VALUES (new.id, new.title); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER card_fts_delete AFTER DELETE ON card BEGIN "
+            "INSERT INTO card_fts(card_fts, rowid, title) VALUES ('delete', old.id, old.title); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER card_fts_update AFTER UPDATE OF title ON card BEGIN "
+            "INSERT INTO card_fts(card_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+            "INSERT INTO card_fts(rowid, title) VALUES (new.id, new.title); END"
+        ))
+        conn.execute(text("INSERT INTO card_fts(card_fts) VALUES ('rebuild')"))
+
+
+def shard_name(user_id: int, mode: str = SHARD_MODE) -> Optional[str]:
+    """Nome do shard do usuário no modo informado, ou None se o sharding está desligado."""
+    if mode == "user":
+        return f"user_{user_id}"
+    shards = int(mode)
+    if shards <= 0:
+        return None
+    return f"shard_{user_id % shards}"
+
+
+def get_shard_engine(name: str) -> Engine:
+    """Engine em cache (LRU) do shard; cria o arquivo e as tabelas na primeira vez."""
+    with _shard_lock:
+        shard_engine = _shard_engines.get(name)
+        if shard_engine is not None:
+            _shard_engines.move_to_end(name)
+            return shard_engine
+        SHARD_DIR.mkdir(parents=True, exist_ok=True)
+        shard_engine = create_engine(
+            f"sqlite:///{SHARD_DIR / name}.db", connect_args={"check_same_thread": False}
+        )
+        tables = [SQLModel.metadata.tables[t] for t in SHARDED_TABLES]
+        SQLModel.metadata.create_all(shard_engine, tables=tables)
+        create_search_index(shard_engine)
+        _shard_engines[name] = shard_engine
+        while len(_shard_engines) > SHARD_ENGINE_CACHE_SIZE:
+            _, evicted = _shard_engines.popitem(last=False)
+            evicted.dispose()
+    return shard_engine
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Descarta os pools do banco principal e dos shards em cache.
+    Em um processo filho (fork), use close=False para não fechar as conexões do pai.
+    """
+    engine.dispose(close=close)
+    with _shard_lock:
+        for shard_engine in _shard_engines.values():
+            shard_engine.dispose(close=close)
+        _shard_engines.clear()
+
+
+def get_engine_for_user(user_id: int, mode: str = SHARD_MODE) -> Engine:
+    """Engine onde ficam o saldo e os cards do usuário."""
+    name = shard_name(user_id, mode)
+    return engine if name is None else get_shard_engine(name)
+
+
+def iter_data_engines(mode: str = SHARD_MODE) -> Iterator[Engine]:
+    """Percorre todos os bancos com dados de usuários (o principal ou os shards existentes)."""
+    if shard_name(0, mode) is None:
+        yield engine
+        return
+    # Só os arquivos do modo atual: sobras de outro modo (antes de um rebalance) ficam de fora
+    pattern = re.compile(r"user_\d+" if mode == "user" else r"shard_\d+")
+    names = {f"shard_{i}" for i in range(int(mode))} if mode != "user" else None
+    for path in sorted(SHARD_DIR.glob("*.db")):
+        if pattern.fullmatch(path.stem) and (names is None or path.stem in names):
+            yield get_shard_engine(path.stem)
+
 
 def get_session():
     """Generator de sessão para injeção de dependência."""
@@ -1,21 +1,30 @@
 """API do Organizador Financeiro - MVP."""
+import asyncio
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse, RedirectResponse
 
+from app.archive import ARCHIVE_INTERVAL_SECONDS, run_archiver
+from app.assets import DIST_DIR, STATIC_DIR, AssetStaticFiles
+from app.compression import CompressionMiddleware
 from app.database import create_db_and_tables
 from app.routers import auth, balance, cards, export
-
-STATIC_DIR = Path(__file__).parent.parent / "static"
+from app.sessions import AUTH_MODE, flush_store, run_session_flusher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    archiver = asyncio.create_task(run_archiver()) if ARCHIVE_INTERVAL_SECONDS > 0 else None
+    flusher = asyncio.create_task(run_session_flusher()) if AUTH_MODE == "session" else None
     yield
+    if archiver is not None:
+        archiver.cancel()
+    if flusher is not None:
+        flusher.cancel()
+        # Renovações ainda em memória não podem se perder no desligamento
+        await asyncio.to_thread(flush_store)
 
 
 app = FastAPI(
@@ -23,8 +32,13 @@ app = FastAPI(
     description="API de CRUD para organizador financeiro: saldo líquido, cards de despesas, faixa (vermelho/amarelo/verde) e exportação em planilha.",
     version="0.1.0",
     lifespan=lifespan,
+    # orjson serializa datas/enums nativamente e é bem mais rápido que o json da stdlib
+    default_response_class=ORJSONResponse,
 )
 
+# gzip/brotli/zstd para respostas acima de FINANCE_COMPRESSION_MIN_SIZE bytes
+app.add_middleware(CompressionMiddleware)
+
 # API sob /api para não conflitar com arquivos estáticos
 app.include_router(auth.router, prefix="/api")
 app.include_router(balance.router, prefix="/api")
@@ -32,8 +46,10 @@ app.include_router(cards.router, prefix="/api")
 app.include_router(export.router, prefix="/api")
 
 # Frontend em /app para não sobrescrever /docs e /openapi.json
+# Usa o build versionado (python -m app.assets) quando disponível
 if STATIC_DIR.exists():
-    app.mount("/app", StaticFiles(directory=str(STATIC_DIR), html=True), name="static")
+    frontend_dir = DIST_DIR if (DIST_DIR / "index.html").exists() else STATIC_DIR
+    app.mount("/app", AssetStaticFiles(directory=str(frontend_dir), html=True), name="static")
 
     @app.get("/")
     def root_redirect():
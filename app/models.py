@@ -46,6 +46,27 @@ class UserRead(SQLModel):
     created_at: datetime
 
 
+class UserSession(SQLModel, table=True):
+    """Sessão opaca do modo FINANCE_AUTH_MODE=session (o id vai no cookie)."""
+    __tablename__ = "user_session"
+
+    id: str = Field(primary_key=True, max_length=64)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True, description="Expiração deslizante (renovada em lote)")
+
+
+class SessionRevocation(SQLModel, table=True):
+    """Log de sessões revogadas, lido por todos os workers para invalidar seus caches."""
+    __tablename__ = "session_revocation"
+    # Workers leem por id crescente: ids não podem ser reutilizados depois da limpeza
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    session_id: str = Field(max_length=64)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
 class Balance(SQLModel, table=True):
     """Saldo líquido total do usuário (único registro por usuário)."""
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -77,6 +98,16 @@ class Card(CardBase, table=True):
     user_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True, description="Usuário dono da despesa")
 
 
+class CardArchive(CardBase, table=True):
+    """Card frio (pago e vencido há tempo) movido para fora da tabela ativa."""
+    __tablename__ = "card_archive"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    percentage: Optional[float] = Field(default=None, description="% em relação ao saldo no momento do arquivamento")
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True, description="Usuário dono da despesa")
+    archived_at: datetime = Field(default_factory=datetime.utcnow, description="Data em que o card foi arquivado")
+
+
 class CardCreate(CardBase):
     """Schema para criação de card (percentage é calculado pela API)."""
     pass
@@ -98,6 +129,28 @@ class CardRead(CardBase):
     percentage: Optional[float] = None
 
 
+class CardHistoryRead(CardRead):
+    """Card no histórico: ativo ou arquivado (ids são por tabela)."""
+    archived: bool = False
+
+
+class CardColumns(SQLModel):
+    """Listagem em formato colunar (?format=columnar): um array por campo."""
+    id: list[int]
+    title: list[str]
+    urgency: list[int]
+    expense_type: list[ExpenseType]
+    value: list[float]
+    percentage: list[Optional[float]]
+    due_date: list[date]
+    status: list[CardStatus]
+
+
+class CardHistoryColumns(CardColumns):
+    """Histórico em formato colunar."""
+    archived: list[bool]
+
+
 # --- Resumo e faixa ---
 
 class Zone(str, Enum):
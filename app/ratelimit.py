@@ -0,0 +1,239 @@
+"""
+Controle de admissão para endpoints caros em CPU (Argon2 no login/cadastro, openpyxl na exportação).
+
+- Token bucket por IP e por usuário: excesso responde 429 com Retry-After.
+- Limite de concorrência por classe de rota: sem vaga, responde 503 com Retry-After.
+
+Limites no formato "<requisições>/<segundos>" via variáveis de ambiente.
+O estado dos buckets fica em memória (padrão) ou em SQLite local, compartilhado
+entre workers (FINANCE_RATE_LIMIT_BACKEND=sqlite). O limite de concorrência é por processo.
+"""
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.models import User
+from app.security import get_current_user
+
+RATE_LIMIT_BACKEND = os.getenv("FINANCE_RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_DB = os.getenv("FINANCE_RATE_LIMIT_DB", "./finance_ratelimit.db")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("FINANCE_RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_SWEEP_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Taxa de um token bucket: capacity requisições a cada period segundos."""
+    capacity: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        capacity, _, period = value.partition("/")
+        return cls(capacity=int(capacity), period=float(period or 60))
+
+    @property
+    def per_second(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass(frozen=True)
+class RouteLimits:
+    """Limites de uma classe de rota."""
+    per_ip: Rate
+    per_user: Rate
+    max_concurrency: int
+
+
+def _limits_from_env(name: str, per_ip: str, per_user: str, concurrency: int) -> RouteLimits:
+    prefix = f"FINANCE_LIMIT_{name.upper()}"
+    return RouteLimits(
+        per_ip=Rate.parse(os.getenv(f"{prefix}_IP", per_ip)),
+        per_user=Rate.parse(os.getenv(f"{prefix}_USER", per_user)),
+        max_concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+    )
+
+
+ROUTE_LIMITS = {
+    "auth": _limits_from_env("auth", per_ip="20/60", per_user="5/60", concurrency=4),
+    "export": _limits_from_env("export", per_ip="10/60", per_user="5/60", concurrency=2),
+}
+MAX_PERIOD = max(
+    rate.period for limits in ROUTE_LIMITS.values() for rate in (limits.per_ip, limits.per_user)
+)
+
+
+def _refill(tokens: float, updated: float, now: float, rate: Rate) -> float:
+    return min(float(rate.capacity), tokens + (now - updated) * rate.per_second)
+
+
+class MemoryBackend:
+    """Buckets no processo atual, limitados a max_keys (os mais antigos saem primeiro)."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        # key -> (tokens, updated, period); ordem = uso mais recente no fim
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+        self._last_sweep = time.time()
+        self._lock = threading.Lock()
+
+    def _sweep(self, now: float) -> None:
+        """Remove buckets parados há pelo menos um período (já estariam cheios de novo)."""
+        self._last_sweep = now
+        for key in [k for k, (_, updated, period) in self._buckets.items() if now - updated >= period]:
+            del self._buckets[key]
+
+    def hit(self, key: str, rate: Rate, consume: bool = True) -> float:
+        """
+        Consome um token; retorna 0 se permitido ou os segundos até o próximo token.
+        Com consume=False só verifica, sem gastar token.
+        """
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep >= RATE_LIMIT_SWEEP_SECONDS:
+                self._sweep(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if not consume:
+                    return 0.0
+                tokens = float(rate.capacity)
+            else:
+                tokens = _refill(bucket[0], bucket[1], now, rate)
+            allowed = tokens >= 1
+            if consume:
+                if allowed:
+                    tokens -= 1
+                self._buckets[key] = (tokens, now, rate.period)
+                self._buckets.move_to_end(key)
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / rate.per_second
+
+
+class SQLiteBackend:
+    """Buckets em um arquivo SQLite local, compartilhado entre workers."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._last_sweep = 0.0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_bucket "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_bucket_updated ON rate_limit_bucket (updated)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, rate: Rate, consume: bool = True) -> float:
+        """
+        Consome um token; retorna 0 se permitido ou os segundos até o próximo token.
+        Com consume=False só verifica, sem gastar token.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now - self._last_sweep >= RATE_LIMIT_SWEEP_SECONDS:
+                # Parados há mais que o maior período já estariam cheios de novo
+                self._last_sweep = now
+                conn.execute("DELETE FROM rate_limit_bucket WHERE updated < ?", (now - MAX_PERIOD,))
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_limit_bucket WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = _refill(row[0], row[1], now, rate) if row else float(rate.capacity)
+            allowed = tokens >= 1
+            if consume:
+                if allowed:
+                    tokens -= 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_bucket (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return 0.0 if allowed else (1 - tokens) / rate.per_second
+
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(RATE_LIMIT_DB)
+    return MemoryBackend()
+
+
+backend = _create_backend()
+_semaphores = {
+    name: threading.BoundedSemaphore(limits.max_concurrency) for name, limits in ROUTE_LIMITS.items()
+}
+
+
+def _too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Muitas requisições. Tente novamente em instantes.",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def check_rate(route: str, scope: str, identity: str, consume: bool = True) -> None:
+    """Consome um token do bucket (route, scope, identity) ou levanta 429. consume=False só verifica."""
+    limits = ROUTE_LIMITS[route]
+    rate = limits.per_ip if scope == "ip" else limits.per_user
+    retry_after = backend.hit(f"{route}:{scope}:{identity}", rate, consume=consume)
+    if retry_after:
+        raise _too_many_requests(retry_after)
+
+
+def record_failure(route: str, identity: str) -> None:
+    """Gasta um token do bucket por usuário sem bloquear a requisição atual."""
+    backend.hit(f"{route}:user:{identity}", ROUTE_LIMITS[route].per_user)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def _acquire_slot(route: str):
+    semaphore = _semaphores[route]
+    if not semaphore.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def limit_auth(request: Request):
+    """Dependência para login/cadastro: bucket por IP + vaga de concorrência."""
+    check_rate("auth", "ip", client_ip(request))
+    yield from _acquire_slot("auth")
+
+
+def limit_export(request: Request, current_user: User = Depends(get_current_user)):
+    """Dependência para exportação: buckets por IP e por usuário + vaga de concorrência."""
+    check_rate("export", "ip", client_ip(request))
+    check_rate("export", "user", str(current_user.id))
+    yield from _acquire_slot("export")
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlmodel import Session, select
 
 from app.database import get_session
 from app.models import User, UserCreate, UserRead
+from app.ratelimit import check_rate, client_ip, limit_auth, record_failure
+from app.sessions import AUTH_MODE
 from app.security import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_MINUTES,
@@ -14,15 +16,22 @@ from app.security import (
     clear_auth_cookies,
     create_access_token,
     create_refresh_token,
+    end_session,
     get_current_user,
     get_password_hash,
     set_auth_cookies,
+    start_session,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=UserRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_auth)],
+)
 def register_user(
     data: UserCreate, response: Response, session: Session = Depends(get_session)
 ) -> User:
@@ -40,6 +49,10 @@ def register_user(
     session.commit()
     session.refresh(user)
 
+    if AUTH_MODE == "session":
+        start_session(session, response, user)
+        return user
+
     access_token = create_access_token(user.username)
     refresh_token = create_refresh_token(user.username)
     set_auth_cookies(response, access_token, refresh_token)
@@ -62,17 +75,28 @@ class LoginPayload(UserCreate):
         }
 
 
-@router.post("/login", response_model=UserRead)
+@router.post("/login", response_model=UserRead, dependencies=[Depends(limit_auth)])
 def login_user(
-    payload: LoginPayload, response: Response, session: Session = Depends(get_session)
+    payload: LoginPayload,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
 ) -> User:
+    # Só falhas gastam o bucket por (usuário, IP): erros de terceiros não bloqueiam o dono da conta
+    attempt_key = f"{payload.username}@{client_ip(request)}"
+    check_rate("auth", "user", attempt_key, consume=False)
     user = authenticate_user(session, payload.username, payload.password)
     if not user:
+        record_failure("auth", attempt_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas",
         )
 
+    if AUTH_MODE == "session":
+        start_session(session, response, user)
+        return user
+
     access_token = create_access_token(user.username)
     refresh_token = create_refresh_token(user.username)
     set_auth_cookies(response, access_token, refresh_token)
@@ -87,9 +111,12 @@ def login_user(
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout_user(response: Response):
+def logout_user(request: Request, session: Session = Depends(get_session)):
+    end_session(session, request)
+    # Os cookies precisam ir na resposta retornada (o Response injetado seria descartado)
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
     clear_auth_cookies(response)
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return response
 
 
 @router.get("/me", response_model=UserRead)
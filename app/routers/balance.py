@@ -2,9 +2,8 @@
 from fastapi import APIRouter, Depends
 from sqlmodel import Session, select
 
-from app.database import get_session
 from app.models import Balance, BalanceUpdate, User
-from app.security import get_current_user
+from app.security import get_current_user, get_user_session
 
 router = APIRouter(prefix="/balance", tags=["balance"])
 
@@ -23,7 +22,7 @@ def get_or_create_balance(session: Session, user: User) -> Balance:
 @router.get("", response_model=Balance)
 def get_balance(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
     """Retorna o saldo líquido atual do usuário autenticado."""
     return get_or_create_balance(session, current_user)
@@ -33,7 +32,7 @@ def get_balance(
 def update_balance(
     data: BalanceUpdate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
     """Define ou atualiza o valor do saldo líquido."""
     balance = get_or_create_balance(session, current_user)
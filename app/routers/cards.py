@@ -1,11 +1,20 @@
 """Endpoints CRUD de cards (despesas)."""
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import re
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import column, table, text
 from sqlmodel import Session, select
 
-from app.database import get_session
+from app.archive import get_card_history
 from app.models import (
     Card,
+    CardArchive,
+    CardColumns,
     CardCreate,
+    CardHistoryColumns,
+    CardHistoryRead,
     CardRead,
     CardUpdate,
     Summary,
@@ -13,11 +22,18 @@ from app.models import (
     Zone,
 )
 from app.routers.balance import get_or_create_balance
-from app.security import get_current_user
+from app.security import get_current_user, get_user_session
 from app.services import compute_percentage, get_totals_and_zone
 
 router = APIRouter(prefix="/cards", tags=["cards"])
 
+# Campos expostos na listagem, na mesma ordem de CardRead
+CARD_FIELDS = ("id", "title", "urgency", "expense_type", "value", "percentage", "due_date", "status")
+HISTORY_FIELDS = CARD_FIELDS + ("archived",)
+
+# Índice FTS5 criado em database.create_search_index (rowid = card.id)
+card_fts = table("card_fts", column("rowid"), column("rank"))
+
 
 def _refresh_card_percentages(session: Session, cards: list[Card], net_balance: float) -> None:
     """Atualiza o campo percentage de cada card e persiste."""
@@ -31,31 +47,85 @@ def _refresh_card_percentages(session: Session, cards: list[Card], net_balance:
         session.refresh(card)
 
 
-@router.get("", response_model=list[CardRead])
+def _card_value(card: Card | CardArchive, field: str):
+    if field == "archived":
+        return isinstance(card, CardArchive)
+    return getattr(card, field)
+
+
+def _serialize_cards(
+    cards: list[Card | CardArchive],
+    response: Response,
+    columnar: bool = False,
+    fields: tuple[str, ...] = CARD_FIELDS,
+) -> ORJSONResponse:
+    """
+    Serializa cards já validados pelo ORM direto para JSON, sem revalidar via CardRead.
+    - padrão: lista de objetos (um por card)
+    - columnar: um array por campo, bem menor para listas grandes
+    Copia os headers do Response injetado (ex.: cookies renovados em get_current_user).
+    """
+    if columnar:
+        content = {field: [_card_value(card, field) for card in cards] for field in fields}
+    else:
+        content = [{field: _card_value(card, field) for field in fields} for card in cards]
+    result = ORJSONResponse(content)
+    result.raw_headers.extend(
+        (key, value) for key, value in response.raw_headers if key != b"content-length"
+    )
+    return result
+
+
+def _fts_query(q: str) -> str | None:
+    """Converte a busca do usuário em consulta FTS5: todos os termos, como prefixo."""
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+@router.get("", response_model=list[CardRead] | CardColumns)
 def list_cards(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
     status_filter: str | None = Query(None, description="Filtrar por status: pago | pendente"),
     expense_type: str | None = Query(None, description="Filtrar por tipo de despesa"),
+    q: str | None = Query(None, max_length=200, description="Buscar no título (ignora acentos e maiúsculas)"),
+    response_format: Literal["rows", "columnar"] = Query(
+        "rows", alias="format", description="Formato da resposta: rows | columnar (um array por campo)"
+    ),
 ):
-    """Lista todos os cards do usuário, opcionalmente filtrados."""
+    """Lista os cards ativos (não arquivados) do usuário, opcionalmente filtrados ou buscados por título."""
     balance = get_or_create_balance(session, current_user)
-    query = select(Card).where(Card.user_id == current_user.id).order_by(Card.urgency, Card.due_date)
+    query = select(Card).where(Card.user_id == current_user.id)
     if status_filter:
         query = query.where(Card.status == status_filter)
     if expense_type:
         query = query.where(Card.expense_type == expense_type)
+    if q:
+        match = _fts_query(q)
+        if match is None:
+            # Busca sem nenhum termo pesquisável (ex.: "!!!") não encontra nada
+            return _serialize_cards([], response, columnar=response_format == "columnar")
+        # Mais relevantes primeiro (bm25), depois a ordem usual
+        query = (
+            query.join(card_fts, card_fts.c.rowid == Card.id)
+            .where(text("card_fts MATCH :match").bindparams(match=match))
+            .order_by(card_fts.c.rank)
+        )
+    query = query.order_by(Card.urgency, Card.due_date)
     cards = list(session.exec(query).all())
     _refresh_card_percentages(session, cards, balance.net_balance)
-    return cards
+    return _serialize_cards(cards, response, columnar=response_format == "columnar")
 
 
 @router.get("/summary", response_model=Summary)
 def get_summary(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
-    """Retorna o resumo do usuário autenticado."""
+    """Retorna o resumo do usuário autenticado (somente cards ativos)."""
     balance = get_or_create_balance(session, current_user)
     cards = list(session.exec(select(Card).where(Card.user_id == current_user.id)).all())
     _refresh_card_percentages(session, cards, balance.net_balance)
@@ -69,6 +139,20 @@ def get_summary(
     )
 
 
+@router.get("/history", response_model=list[CardHistoryRead] | CardHistoryColumns)
+def list_card_history(
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_user_session),
+    response_format: Literal["rows", "columnar"] = Query(
+        "rows", alias="format", description="Formato da resposta: rows | columnar (um array por campo)"
+    ),
+):
+    """Lista cards ativos e arquivados do usuário (arquivados mantêm o % do arquivamento)."""
+    cards = get_card_history(session, current_user.id)
+    return _serialize_cards(cards, response, columnar=response_format == "columnar", fields=HISTORY_FIELDS)
+
+
 def _get_user_card(session: Session, card_id: int, user: User) -> Card:
     card = session.exec(select(Card).where(Card.id == card_id, Card.user_id == user.id)).first()
     if not card:
@@ -80,7 +164,7 @@ def _get_user_card(session: Session, card_id: int, user: User) -> Card:
 def get_card(
     card_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
     """Retorna um card pelo ID."""
     balance = get_or_create_balance(session, current_user)
@@ -93,7 +177,7 @@ def get_card(
 def create_card(
     data: CardCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
     """Cria um novo card de despesa."""
     balance = get_or_create_balance(session, current_user)
@@ -118,7 +202,7 @@ def update_card(
     card_id: int,
     data: CardUpdate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
     """Atualiza um card existente."""
     balance = get_or_create_balance(session, current_user)
@@ -137,7 +221,7 @@ def update_card(
 def delete_card(
     card_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
     """Remove um card."""
     card = _get_user_card(session, card_id, current_user)
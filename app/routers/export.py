@@ -6,12 +6,13 @@ from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from sqlmodel import Session, select
+from sqlmodel import Session
 
-from app.database import get_session
+from app.archive import get_card_history
 from app.models import Card, User
+from app.ratelimit import limit_export
 from app.routers.balance import get_or_create_balance
-from app.security import get_current_user
+from app.security import get_current_user, get_user_session
 from app.routers.cards import _refresh_card_percentages
 from app.services import get_totals_and_zone
 
@@ -41,13 +42,12 @@ TYPE_LABELS = {
 
 def _build_workbook(session: Session, user: User) -> Workbook:
     balance = get_or_create_balance(session, user)
-    cards = list(
-        session.exec(
-            select(Card).where(Card.user_id == user.id).order_by(Card.urgency, Card.due_date)
-        ).all()
-    )
-    _refresh_card_percentages(session, cards, balance.net_balance)
-    total_expenses, total_percentage, zone = get_totals_and_zone(cards, balance.net_balance)
+    # Histórico completo: ativos com % atualizado, arquivados com o % do arquivamento
+    cards = get_card_history(session, user.id)
+    active_cards = [c for c in cards if isinstance(c, Card)]
+    _refresh_card_percentages(session, active_cards, balance.net_balance)
+    # Resumo geral igual ao /api/cards/summary: só cards ativos, todos com % do saldo atual
+    total_expenses, total_percentage, zone = get_totals_and_zone(active_cards, balance.net_balance)
 
     wb = Workbook()
     ws = wb.active
@@ -142,10 +142,10 @@ def _build_workbook(session: Session, user: User) -> Workbook:
     return wb
 
 
-@router.get("/spreadsheet")
+@router.get("/spreadsheet", dependencies=[Depends(limit_export)])
 def export_spreadsheet(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_user_session),
 ):
     """Gera e retorna um arquivo Excel (.xlsx) com resumo e lista de despesas."""
     wb = _build_workbook(session, current_user)
@@ -11,8 +11,9 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlmodel import Session, select
 
-from app.database import get_session
+from app.database import get_engine_for_user, get_session
 from app.models import User
+from app.sessions import AUTH_MODE, SESSION_COOKIE, SESSION_IDLE_MINUTES, store
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -117,6 +118,18 @@ def set_auth_cookies(response: Response, access_token: str, refresh_token: str)
     )
 
 
+def set_session_cookie(response: Response, session_id: str) -> None:
+    response.set_cookie(
+        key=SESSION_COOKIE,
+        value=session_id,
+        max_age=SESSION_IDLE_MINUTES * 60,
+        httponly=True,
+        secure=COOKIE_SECURE,
+        samesite=COOKIE_SAMESITE,
+        path="/",
+    )
+
+
 def clear_auth_cookies(response: Response) -> None:
     cookie_kwargs = {
         "httponly": True,
@@ -126,6 +139,36 @@ def clear_auth_cookies(response: Response) -> None:
     }
     response.delete_cookie(ACCESS_COOKIE, **cookie_kwargs)
     response.delete_cookie(REFRESH_COOKIE, **cookie_kwargs)
+    response.delete_cookie(SESSION_COOKIE, **cookie_kwargs)
+
+
+def start_session(session: Session, response: Response, user: User) -> None:
+    """Modo session: cria a sessão opaca e grava o cookie."""
+    set_session_cookie(response, store.create(session, user.id))
+
+
+def end_session(session: Session, request: Request) -> None:
+    """Modo session: revoga a sessão do cookie em todos os workers."""
+    session_id = request.cookies.get(SESSION_COOKIE)
+    if session_id:
+        store.revoke(session, session_id)
+
+
+def _get_session_user(request: Request, response: Response, session: Session) -> User:
+    session_id = request.cookies.get(SESSION_COOKIE)
+    if not session_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Autenticação necessária"
+        )
+    user_id, renewed = store.resolve(session, session_id)
+    user = session.get(User, user_id) if user_id is not None else None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Sessão inválida ou expirada"
+        )
+    if renewed:
+        set_session_cookie(response, session_id)
+    return user
 
 
 def get_current_user(
@@ -133,6 +176,9 @@ def get_current_user(
     response: Response,
     session: Session = Depends(get_session),
 ) -> User:
+    if AUTH_MODE == "session":
+        return _get_session_user(request, response, session)
+
     access_token = request.cookies.get(ACCESS_COOKIE)
     if not access_token:
         raise HTTPException(
@@ -164,3 +210,9 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado"
         )
     return user
+
+
+def get_user_session(current_user: User = Depends(get_current_user)):
+    """Sessão no banco (ou shard) que guarda o saldo e os cards do usuário autenticado."""
+    with Session(get_engine_for_user(current_user.id)) as session:
+        yield session
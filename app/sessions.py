@@ -0,0 +1,205 @@
+"""
+Sessões opacas no servidor (FINANCE_AUTH_MODE=session), alternativa aos JWTs.
+
+O cookie guarda só um id aleatório. Cada worker mantém um cache em memória (TTL + LRU)
+de id -> (usuário, expiração), então a maioria das requisições não toca na tabela de sessões.
+A expiração é deslizante, mas a renovação só acontece quando falta menos da metade do
+prazo e é gravada em lote. O logout apaga a sessão e registra a revogação em
+session_revocation, que todo worker consulta (busca por id crescente) antes de usar o cache.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models import SessionRevocation, UserSession
+
+AUTH_MODE = os.getenv("FINANCE_AUTH_MODE", "jwt").lower()
+
+SESSION_COOKIE = "finance_session"
+SESSION_IDLE_MINUTES = int(os.getenv("FINANCE_SESSION_IDLE_MINUTES", str(60 * 24 * 7)))
+SESSION_CACHE_SIZE = int(os.getenv("FINANCE_SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_TTL_SECONDS = int(os.getenv("FINANCE_SESSION_CACHE_TTL_SECONDS", "300"))
+SESSION_FLUSH_SECONDS = int(os.getenv("FINANCE_SESSION_FLUSH_SECONDS", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedSession:
+    user_id: int
+    expires_at: datetime
+    loaded_at: float
+
+
+class SessionStore:
+    """Cache de sessões do processo + escrita em lote das renovações."""
+
+    def __init__(
+        self,
+        idle: timedelta = timedelta(minutes=SESSION_IDLE_MINUTES),
+        cache_size: int = SESSION_CACHE_SIZE,
+        cache_ttl: float = SESSION_CACHE_TTL_SECONDS,
+        flush_interval: float = SESSION_FLUSH_SECONDS,
+    ) -> None:
+        self.idle = idle
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.flush_interval = flush_interval
+        self._cache: OrderedDict[str, CachedSession] = OrderedDict()
+        self._pending: dict[str, datetime] = {}
+        self._last_revocation_id: Optional[int] = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _remember(self, session_id: str, entry: CachedSession) -> None:
+        self._cache[session_id] = entry
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _forget(self, session_id: str) -> None:
+        self._cache.pop(session_id, None)
+        self._pending.pop(session_id, None)
+
+    def _sync_revocations(self, db: Session) -> None:
+        """Remove do cache as sessões revogadas por qualquer worker desde a última consulta."""
+        with self._lock:
+            last_id = self._last_revocation_id
+        if last_id is None:
+            last = db.exec(select(func.max(SessionRevocation.id))).one()
+            with self._lock:
+                if self._last_revocation_id is None:
+                    self._last_revocation_id = last or 0
+            return
+        rows = db.exec(
+            select(SessionRevocation.id, SessionRevocation.session_id).where(
+                SessionRevocation.id > last_id
+            )
+        ).all()
+        if not rows:
+            return
+        with self._lock:
+            for revocation_id, session_id in rows:
+                self._forget(session_id)
+                self._last_revocation_id = max(self._last_revocation_id, revocation_id)
+
+    def create(self, db: Session, user_id: int) -> str:
+        session_id = secrets.token_urlsafe(32)
+        expires_at = datetime.utcnow() + self.idle
+        db.add(UserSession(id=session_id, user_id=user_id, expires_at=expires_at))
+        db.commit()
+        self._sync_revocations(db)
+        with self._lock:
+            self._remember(session_id, CachedSession(user_id, expires_at, time.monotonic()))
+        return session_id
+
+    def resolve(self, db: Session, session_id: str) -> tuple[Optional[int], bool]:
+        """Retorna (user_id, renovada). user_id é None se a sessão não existe, expirou ou foi revogada."""
+        # Consultas ao banco ficam fora do lock; ele protege só o cache e as renovações pendentes
+        self._sync_revocations(db)
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry is not None and time.monotonic() - entry.loaded_at > self.cache_ttl:
+                entry = None
+        if entry is None:
+            row = db.get(UserSession, session_id)
+            with self._lock:
+                if row is None:
+                    self._forget(session_id)
+                    return None, False
+                expires_at = max(row.expires_at, self._pending.get(session_id, row.expires_at))
+                entry = CachedSession(row.user_id, expires_at, time.monotonic())
+
+        now = datetime.utcnow()
+        with self._lock:
+            if entry.expires_at <= now:
+                self._forget(session_id)
+                return None, False
+            renewed = entry.expires_at - now < self.idle / 2
+            if renewed:
+                entry.expires_at = now + self.idle
+                self._pending[session_id] = entry.expires_at
+            self._remember(session_id, entry)
+            user_id = entry.user_id
+        self.maybe_flush(db)
+        return user_id, renewed
+
+    def revoke(self, db: Session, session_id: str) -> None:
+        db.exec(delete(UserSession).where(UserSession.id == session_id))
+        db.add(SessionRevocation(session_id=session_id))
+        db.commit()
+        with self._lock:
+            self._forget(session_id)
+
+    def maybe_flush(self, db: Session) -> None:
+        """Grava as renovações se o intervalo passou; falhas não derrubam a requisição."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            try:
+                self.flush(db)
+            except Exception:
+                logger.exception("Falha ao gravar renovações de sessão")
+
+    def flush(self, db: Session) -> None:
+        """
+        Grava as renovações pendentes e limpa sessões expiradas e revogações antigas.
+        Se a escrita falhar, as renovações voltam para a fila.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        now = datetime.utcnow()
+        try:
+            for session_id, expires_at in pending.items():
+                db.exec(
+                    update(UserSession)
+                    .where(UserSession.id == session_id, UserSession.expires_at < expires_at)
+                    .values(expires_at=expires_at)
+                )
+            db.exec(delete(UserSession).where(UserSession.expires_at < now))
+            # Caches mais antigos que o TTL já releem do banco, então revogações antigas podem sair
+            db.exec(
+                delete(SessionRevocation).where(
+                    SessionRevocation.created_at < now - timedelta(seconds=2 * self.cache_ttl)
+                )
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for session_id, expires_at in pending.items():
+                    current = self._pending.get(session_id)
+                    if current is None or current < expires_at:
+                        self._pending[session_id] = expires_at
+            raise
+
+
+store = SessionStore()
+
+
+def flush_store() -> None:
+    """Grava as renovações pendentes do store do processo."""
+    with Session(engine) as db:
+        store.flush(db)
+
+
+async def run_session_flusher(interval: int = SESSION_FLUSH_SECONDS) -> None:
+    """Tarefa de fundo: grava as renovações mesmo sem requisições chegando."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush_store)
+        except Exception:
+            logger.exception("Falha ao gravar renovações de sessão")
@@ -0,0 +1,101 @@
+"""
+CLI de migração e rebalanceamento de shards.
+
+    python -m app.sharding migrate                 # banco principal -> FINANCE_SHARDS atual
+    python -m app.sharding rebalance --from 4      # 4 shards -> FINANCE_SHARDS atual
+    python -m app.sharding rebalance --from 4 --to user
+    python -m app.sharding status
+
+Os modos seguem FINANCE_SHARDS: "0" (sem sharding), N (N arquivos) ou "user".
+Registros movidos ganham novos IDs no shard de destino. Pare o servidor antes de rodar:
+escritas durante a cópia podem se perder.
+"""
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.database import (
+    SHARD_MODE,
+    create_db_and_tables,
+    engine,
+    get_engine_for_user,
+    iter_data_engines,
+)
+from app.models import Balance, Card, CardArchive, User
+
+SHARDED_MODELS = (Balance, Card, CardArchive)
+
+
+def move_user_data(user_id: int, source_mode: str, target_mode: str) -> int:
+    """
+    Copia os dados do usuário para o shard de destino e apaga da origem. Retorna linhas movidas.
+    Idempotente: o destino é limpo antes da cópia, então rodar de novo após uma falha não duplica.
+    """
+    source = get_engine_for_user(user_id, source_mode)
+    target = get_engine_for_user(user_id, target_mode)
+    if source is target:
+        return 0
+
+    with Session(source) as src, Session(target) as dst:
+        rows = []
+        for model in SHARDED_MODELS:
+            rows.extend(src.exec(select(model).where(model.user_id == user_id)).all())
+        if not rows:
+            # Nada na origem: já movido (ou usuário sem dados); não mexe no destino
+            return 0
+        for model in SHARDED_MODELS:
+            dst.exec(delete(model).where(model.user_id == user_id))
+        for row in rows:
+            dst.add(type(row)(**row.model_dump(exclude={"id"})))
+        dst.commit()
+        for row in rows:
+            src.delete(row)
+        src.commit()
+    return len(rows)
+
+
+def rebalance(source_mode: str, target_mode: str) -> None:
+    create_db_and_tables()
+    with Session(engine) as session:
+        user_ids = list(session.exec(select(User.id)).all())
+    total = 0
+    for i, user_id in enumerate(user_ids, 1):
+        total += move_user_data(user_id, source_mode, target_mode)
+        if i % 100 == 0 or i == len(user_ids):
+            print(f"{i}/{len(user_ids)} usuários processados, {total} registros movidos")
+
+
+def status(mode: str) -> None:
+    for data_engine in iter_data_engines(mode):
+        with Session(data_engine) as session:
+            counts = ", ".join(
+                f"{model.__tablename__}={len(session.exec(select(model.id)).all())}"
+                for model in SHARDED_MODELS
+            )
+        print(f"{data_engine.url.database}: {counts}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.sharding", description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="move os dados do banco principal para os shards")
+    rebalance_parser = sub.add_parser("rebalance", help="redistribui os dados entre configurações de shards")
+    rebalance_parser.add_argument("--from", dest="source", required=True, help='modo de origem: 0, N ou "user"')
+    rebalance_parser.add_argument("--to", dest="target", default=SHARD_MODE, help="modo de destino (padrão: FINANCE_SHARDS)")
+    status_parser = sub.add_parser("status", help="mostra a contagem de registros por banco")
+    status_parser.add_argument("--mode", default=SHARD_MODE)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        rebalance("0", SHARD_MODE)
+    elif args.command == "rebalance":
+        rebalance(args.source.lower(), args.target.lower())
+    else:
+        status(args.mode.lower())
+
+
+if __name__ == "__main__":
+    main()
@@ -239,9 +239,11 @@ async function loadSummary() {
 function getFilters() {
   const statusFilter = $("filter-status").value || undefined;
   const expenseType = $("filter-type").value || undefined;
+  const search = $("filter-q").value.trim() || undefined;
   const params = new URLSearchParams();
   if (statusFilter) params.set("status", statusFilter);
   if (expenseType) params.set("expense_type", expenseType);
+  if (search) params.set("q", search);
   const q = params.toString();
   return q ? "?" + q : "";
 }
@@ -430,6 +432,11 @@ $("form-card").addEventListener("submit", submitCard);
 $("modal-cancel").addEventListener("click", closeModal);
 $("filter-status").addEventListener("change", onFilterChange);
 $("filter-type").addEventListener("change", onFilterChange);
+let searchTimer = null;
+$("filter-q").addEventListener("input", () => {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(onFilterChange, 250);
+});
 
 elements.authTabLogin.addEventListener("click", () => switchAuthMode("login"));
 elements.authTabRegister.addEventListener("click", () => switchAuthMode("register"));